@@ -1,4 +1,5 @@
 import os
+import asyncio
 import httpx
 import urllib3
 from mcp.server.fastmcp import FastMCP
@@ -6,56 +7,326 @@ from typing import Any
 import uvicorn
 import sys
 import re
+import itertools
 import json
+import time
 import yaml 
+from collections import Counter, OrderedDict, deque
+from datetime import UTC, datetime
 
 # Disable SSL warnings for lab environments with self-signed certificates
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-# Environment variables for authentication
+# Environment variables for authentication of the default controller
 AAP_URL = os.getenv("AAP_URL")
 AAP_TOKEN = os.getenv("AAP_TOKEN")
 
 EDA_URL = os.getenv("EDA_URL")
 EDA_TOKEN = os.getenv("EDA_TOKEN")
 
+# Additional controllers as a JSON object keyed by controller name, e.g.
+# {"east": {"aap_url": "...", "aap_token": "...", "eda_url": "...", "eda_token": "...",
+#           "max_concurrent_requests": 10, "max_requests_per_second": 5}}
+AAP_CONTROLLERS = os.getenv("AAP_CONTROLLERS", "{}")
+# Per-controller request limits unless overridden in AAP_CONTROLLERS: in-flight requests, and
+# requests started per second (0 disables the rate limit)
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "20"))
+MAX_REQUESTS_PER_SECOND = float(os.getenv("MAX_REQUESTS_PER_SECOND", "0"))
+
+# Bounds for the per-host facts snapshot history kept in memory
+FACTS_HISTORY_MAX_VERSIONS = int(os.getenv("FACTS_HISTORY_MAX_VERSIONS", "10"))
+FACTS_HISTORY_MAX_BYTES = int(os.getenv("FACTS_HISTORY_MAX_BYTES", str(2 * 1024 * 1024)))
+# Process-wide bound on facts history; least recently used hosts are evicted first
+FACTS_HISTORY_MAX_TOTAL_BYTES = int(os.getenv("FACTS_HISTORY_MAX_TOTAL_BYTES", str(256 * 1024 * 1024)))
+# Maximum number of (controller, inventory, fact paths) baselines kept for fleet facts diffs
+FLEET_FACTS_MAX_BASELINES = int(os.getenv("FLEET_FACTS_MAX_BASELINES", "100"))
+# Maximum number of concurrent requests for fleet-wide lookups
+FLEET_CONCURRENCY = int(os.getenv("FLEET_CONCURRENCY", "20"))
+
+# Limits on the samples kept per failed task when summarizing job failures
+FAILURE_SUMMARY_MAX_SAMPLES = int(os.getenv("FAILURE_SUMMARY_MAX_SAMPLES", "5"))
+FAILURE_SUMMARY_MESSAGE_LENGTH = 300
+
+# Terminal states of AAP unified jobs
+FINISHED_JOB_STATUSES = ["successful", "failed", "error", "canceled"]
+
+# Facts snapshot history keyed by (controller name, host id), ordered from least to most recently used
+FACTS_HISTORY: OrderedDict[tuple[str, int], deque] = OrderedDict()
+facts_history_bytes = 0
+# Snapshot versions come from one process-wide counter, so a version number is never reused
+# for a host even after its history was evicted
+FACTS_VERSIONS = itertools.count(1)
+
+# Fleet facts baselines keyed by (controller name, inventory id, fact paths), holding only the
+# requested fact values per host, ordered from least to most recently used. Keys of evicted
+# baselines are remembered so that a missing baseline can be reported as evicted.
+FLEET_FACTS_BASELINES: OrderedDict[tuple, dict] = OrderedDict()
+FLEET_FACTS_EVICTED: OrderedDict[tuple, None] = OrderedDict()
+
+# Inventory statistics keyed by (controller name, inventory id, fact paths, top), invalidated
+# when the inventory's modified timestamp changes or after INVENTORY_STATS_TTL seconds.
+# Invalidated entries are pruned on every lookup.
+INVENTORY_STATS_CACHE: dict[tuple, dict] = {}
+INVENTORY_STATS_TTL = int(os.getenv("INVENTORY_STATS_TTL", "300"))
+
+
+class Controller:
+    """Connection settings, pooled HTTP clients and request limits for one AAP/EDA backend."""
+
+    def __init__(
+        self,
+        name: str,
+        aap_url: str,
+        aap_token: str,
+        eda_url: str = None,
+        eda_token: str = None,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+        max_requests_per_second: float = MAX_REQUESTS_PER_SECOND,
+    ):
+        self.name = name
+        self.aap_url = aap_url
+        self.eda_url = eda_url
+        self.headers = {"Authorization": f"Bearer {aap_token}", "Content-Type": "application/json"}
+        self.headers_eda = {"Authorization": f"Bearer {eda_token}", "Content-Type": "application/json"}
+        self.max_concurrent_requests = max_concurrent_requests
+        self.semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self.max_requests_per_second = max_requests_per_second
+        self.rate_lock = asyncio.Lock()
+        self.next_request_at = 0.0
+        self.clients: dict[str, httpx.AsyncClient] = {}
+
+    async def throttle(self) -> None:
+        """Wait until the next request may start under the requests-per-second limit."""
+        if not self.max_requests_per_second:
+            return
+        async with self.rate_lock:
+            loop = asyncio.get_running_loop()
+            delay = self.next_request_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.next_request_at = max(loop.time(), self.next_request_at) + 1 / self.max_requests_per_second
+
+    def client(self, api: str = "aap") -> httpx.AsyncClient:
+        """Return the pooled client for the AAP or EDA API, creating it on first use."""
+        if api not in self.clients:
+            base_url, headers = (self.eda_url, self.headers_eda) if api == "eda" else (self.aap_url, self.headers)
+            if not base_url:
+                raise ValueError(f"No {api.upper()} URL configured for controller '{self.name}'")
+            # For lab environments, disable SSL verification for self-signed certificates
+            self.clients[api] = httpx.AsyncClient(
+                base_url=base_url.rstrip("/"),
+                headers=headers,
+                verify=False,
+                timeout=60.0,
+                limits=httpx.Limits(max_connections=self.max_concurrent_requests),
+            )
+        return self.clients[api]
+
+
+def load_controllers() -> dict[str, Controller]:
+    """Build the controller registry from AAP_URL/AAP_TOKEN and AAP_CONTROLLERS."""
+    controllers = {}
+    if AAP_TOKEN:
+        controllers["default"] = Controller("default", AAP_URL, AAP_TOKEN, EDA_URL, EDA_TOKEN)
+    for name, config in json.loads(AAP_CONTROLLERS).items():
+        if name in controllers:
+            raise ValueError(f"AAP_CONTROLLERS entry '{name}' collides with the controller set by AAP_URL/AAP_TOKEN")
+        if not isinstance(config, dict):
+            raise ValueError(f"AAP_CONTROLLERS entry '{name}' must be an object")
+        missing = [field for field in ("aap_url", "aap_token") if not config.get(field)]
+        if missing:
+            raise ValueError(f"AAP_CONTROLLERS entry '{name}' is missing {', '.join(missing)}")
+        controllers[name] = Controller(
+            name,
+            config["aap_url"],
+            config["aap_token"],
+            config.get("eda_url"),
+            config.get("eda_token", config["aap_token"]),
+            config.get("max_concurrent_requests", MAX_CONCURRENT_REQUESTS),
+            config.get("max_requests_per_second", MAX_REQUESTS_PER_SECOND),
+        )
+    return controllers
+
+
+CONTROLLERS = load_controllers()
 
-if not AAP_TOKEN:
-    raise ValueError("AAP_TOKEN is required")
+if not CONTROLLERS:
+    raise ValueError("AAP_TOKEN or AAP_CONTROLLERS is required")
+
+DEFAULT_CONTROLLER = os.getenv("AAP_DEFAULT_CONTROLLER") or next(iter(CONTROLLERS))
+
+if DEFAULT_CONTROLLER not in CONTROLLERS:
+    raise ValueError(
+        f"AAP_DEFAULT_CONTROLLER '{DEFAULT_CONTROLLER}' is not configured. "
+        f"Available controllers: {', '.join(CONTROLLERS)}"
+    )
 
-# Headers for API authentication
-HEADERS = {"Authorization": f"Bearer {AAP_TOKEN}", "Content-Type": "application/json"}
-HEADERS_EDA = {"Authorization": f"Bearer {EDA_TOKEN}", "Content-Type": "application/json"}
+
+def get_controller(name: str = None) -> Controller:
+    """Look up a controller by name, falling back to the default controller."""
+    name = name or DEFAULT_CONTROLLER
+    controller = CONTROLLERS.get(name)
+    if controller is None:
+        raise ValueError(f"Unknown controller '{name}'. Available controllers: {', '.join(CONTROLLERS)}")
+    return controller
 
 
 # Initialize FastMCP
 mcp = FastMCP("ansible", host="0.0.0.0", port=8000)
 
 
-async def make_request(url: str, method: str = "GET", json: dict = None) -> Any:
+async def make_request(path: str, method: str = "GET", json: dict = None, controller: str = None) -> Any:
     """Helper function to make authenticated API requests to AAP."""
-    # For lab environments, disable SSL verification for self-signed certificates
-    async with httpx.AsyncClient(verify=False) as client:
-        response = await client.request(method, url, headers=HEADERS, json=json)
-    if response.status_code not in [200, 201]:
+    backend = get_controller(controller)
+    async with backend.semaphore:
+        await backend.throttle()
+        response = await backend.client("aap").request(method, path, json=json)
+    if response.status_code not in [200, 201, 202]:
         return f"Error {response.status_code}: {response.text}"
     return response.json() if "application/json" in response.headers.get("Content-Type", "") else response.text
 
-async def make_request_eda(url: str, method: str = "GET", json: dict = None) -> Any:
+async def make_request_eda(path: str, method: str = "GET", json: dict = None, controller: str = None) -> Any:
     """Helper function to make authenticated API requests to EDA."""
-    # For lab environments, disable SSL verification for self-signed certificates
-    async with httpx.AsyncClient(verify=False) as client:
-        response = await client.request(method, url, headers=HEADERS_EDA, json=json)
+    backend = get_controller(controller)
+    async with backend.semaphore:
+        await backend.throttle()
+        response = await backend.client("eda").request(method, path, json=json)
     if response.status_code not in [200, 201]:
         return f"Error {response.status_code}: {response.text}"
     return response.json() if "application/json" in response.headers.get("Content-Type", "") else response.text
 
 
+async def iter_pages(path: str, page_size: int = 200, controller: str = None):
+    """Yield items from a paginated AAP list endpoint, fetching one page at a time."""
+    separator = "&" if "?" in path else "?"
+    page = 1
+    while True:
+        data = await make_request(f"{path}{separator}page_size={page_size}&page={page}", controller=controller)
+        if isinstance(data, str):
+            raise ValueError(data)
+        for item in data.get("results", []):
+            yield item
+        if not data.get("next"):
+            break
+        page += 1
+
+
+async def wait_for_job(path: str, timeout: int = 600, max_interval: float = 10.0, controller: str = None) -> dict:
+    """Poll a unified job until it finishes and its events are processed, backing off between polls."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    interval = 1.0
+    while True:
+        job = await make_request(path, controller=controller)
+        if isinstance(job, str):
+            raise ValueError(job)
+        if job.get("status") in FINISHED_JOB_STATUSES and job.get("event_processing_finished", True):
+            return job
+        if loop.time() + interval > deadline:
+            raise TimeoutError(f"Job {job.get('id')} still '{job.get('status')}' after {timeout} seconds")
+        await asyncio.sleep(interval)
+        interval = min(interval * 2, max_interval)
+
+
+def record_facts_snapshot(controller: str, host_id: int, facts: dict) -> dict:
+    """Store a facts snapshot for a host, evicting the oldest versions beyond the history bounds."""
+    global facts_history_bytes
+    key = (get_controller(controller).name, host_id)
+    history = FACTS_HISTORY.setdefault(key, deque())
+    FACTS_HISTORY.move_to_end(key)
+    if history and history[-1]["facts"] == facts:
+        return history[-1]
+
+    snapshot = {
+        "version": next(FACTS_VERSIONS),
+        "captured_at": datetime.now(UTC).isoformat(),
+        "facts": facts,
+        "size": len(json.dumps(facts, default=str)),
+    }
+    history.append(snapshot)
+    facts_history_bytes += snapshot["size"]
+
+    # Always keep the latest snapshot, even if it alone exceeds the byte budget
+    total_size = sum(s["size"] for s in history)
+    while len(history) > 1 and (len(history) > FACTS_HISTORY_MAX_VERSIONS or total_size > FACTS_HISTORY_MAX_BYTES):
+        evicted_size = history.popleft()["size"]
+        total_size -= evicted_size
+        facts_history_bytes -= evicted_size
+
+    # Drop whole histories of the least recently used hosts beyond the process-wide budget
+    while len(FACTS_HISTORY) > 1 and facts_history_bytes > FACTS_HISTORY_MAX_TOTAL_BYTES:
+        _, evicted = FACTS_HISTORY.popitem(last=False)
+        facts_history_bytes -= sum(s["size"] for s in evicted)
+    return snapshot
+
+
+def find_facts_snapshot(history: deque, since: int | str) -> dict:
+    """Find a snapshot by version number, or the latest one captured at or before an ISO timestamp."""
+    if isinstance(since, int) or since.isdigit():
+        return next((s for s in history if s["version"] == int(since)), None)
+
+    cutoff = datetime.fromisoformat(since)
+    if cutoff.tzinfo is None:
+        cutoff = cutoff.replace(tzinfo=UTC)
+    earlier = [s for s in history if datetime.fromisoformat(s["captured_at"]) <= cutoff]
+    return earlier[-1] if earlier else None
+
+
+def facts_versions(history: deque) -> list[dict]:
+    """List the version numbers and capture times of a host's retained facts snapshots."""
+    return [{"version": s["version"], "captured_at": s["captured_at"]} for s in history]
+
+
+def diff_facts(old: Any, new: Any, path: str = "", diff: dict = None) -> dict:
+    """Return a structural diff of two facts documents keyed by dotted fact path."""
+    if diff is None:
+        diff = {"added": {}, "removed": {}, "changed": {}}
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in sorted(old.keys() | new.keys(), key=str):
+            child = f"{path}.{key}" if path else str(key)
+            if key not in new:
+                diff["removed"][child] = old[key]
+            elif key not in old:
+                diff["added"][child] = new[key]
+            else:
+                diff_facts(old[key], new[key], child, diff)
+    elif old != new:
+        diff["changed"][path] = {"old": old, "new": new}
+    return diff
+
+
+def get_fact(facts: Any, path: str) -> Any:
+    """Look up a dotted fact path such as 'ansible_default_ipv4.address', returning None if absent."""
+    value = facts
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+@mcp.tool()
+async def list_controllers() -> Any:
+    """List the AAP/EDA controllers this server can talk to; pass a name as `controller` to any tool."""
+    return [
+        {
+            "name": backend.name,
+            "aap_url": backend.aap_url,
+            "eda_url": backend.eda_url,
+            "default": backend.name == DEFAULT_CONTROLLER,
+            "max_concurrent_requests": backend.max_concurrent_requests,
+            "max_requests_per_second": backend.max_requests_per_second,
+        }
+        for backend in CONTROLLERS.values()
+    ]
+
+
 @mcp.tool()
-async def get_recent_prompt_job_id() -> Any:
+async def get_recent_prompt_job_id(controller: str = None) -> Any:
     """Return the most recent job id for the Lightspeed Prompt job template."""
     job_data = await make_request(
-        f"{AAP_URL}/jobs/?name=Get%20Lightspeed%20Prompt&order_by=-id"
+        "/jobs/?name=Get%20Lightspeed%20Prompt&order_by=-id", controller=controller
     )
 
     if not job_data or "results" not in job_data or len(job_data["results"]) == 0:
@@ -64,10 +335,10 @@ async def get_recent_prompt_job_id() -> Any:
     return job_data["results"][0]["id"]
 
 @mcp.tool()
-async def get_job_template_id(name: str) -> Any:
+async def get_job_template_id(name: str, controller: str = None) -> Any:
     """Return the Template ID for a given job template name."""
     job_data = await make_request(
-        f"{AAP_URL}/job_templates/?name={name}"
+        f"/job_templates/?name={name}", controller=controller
     )
 
     if not job_data or "results" not in job_data or len(job_data["results"]) == 0:
@@ -78,13 +349,13 @@ async def get_job_template_id(name: str) -> Any:
 
 
 @mcp.tool()
-async def run_workflow(extra_vars: dict = {}) -> Any:
+async def run_workflow(extra_vars: dict = {}, controller: str = None) -> Any:
     """Run Remediation Workflow with extra_vars."""
 
     try:
         # Step 1: Get Remediation Workflow template ID
         job_data = await make_request(
-            f"{AAP_URL}/workflow_job_templates/?name=Remediation%20Workflow"
+            "/workflow_job_templates/?name=Remediation%20Workflow", controller=controller
         )
 
         if not job_data or "results" not in job_data or len(job_data["results"]) == 0:
@@ -94,9 +365,10 @@ async def run_workflow(extra_vars: dict = {}) -> Any:
 
         # Step 2: Launch the workflow
         response = await make_request(
-            f"{AAP_URL}/workflow_job_templates/{template_id}/launch/",
+            f"/workflow_job_templates/{template_id}/launch/",
             method="POST",
-            json={"extra_vars": extra_vars}
+            json={"extra_vars": extra_vars},
+            controller=controller,
         )
 
         return response
@@ -107,16 +379,17 @@ async def run_workflow(extra_vars: dict = {}) -> Any:
 
 
 @mcp.tool()
-async def run_lightspeed_job_and_get_yaml(template_id: int, extra_vars: dict = {}) -> str:
+async def run_lightspeed_job_and_get_yaml(template_id: int, extra_vars: dict = {}, controller: str = None) -> str:
     """
     Run the Lightspeed job template by ID, wait for it to finish, and then give the generated Playbook 
     from the job stdout output (full debug logic included).
     """
     # Step 1: Launch the job
     launch_response = await make_request(
-        f"{AAP_URL}/job_templates/{template_id}/launch/",
+        f"/job_templates/{template_id}/launch/",
         method="POST",
-        json={"extra_vars": extra_vars}
+        json={"extra_vars": extra_vars},
+        controller=controller,
     )
 
     job_id = launch_response.get("id")
@@ -126,13 +399,13 @@ async def run_lightspeed_job_and_get_yaml(template_id: int, extra_vars: dict = {
     # Step 2: Wait for job completion
     import asyncio
     while True:
-        job_status = await make_request(f"{AAP_URL}/jobs/{job_id}/")
+        job_status = await make_request(f"/jobs/{job_id}/", controller=controller)
         if job_status.get("status") in ["successful", "failed", "error", "canceled"]:
             break
         await asyncio.sleep(2)
 
     # Step 3: Retrieve job stdout
-    stdout = await make_request(f"{AAP_URL}/jobs/{job_id}/stdout/?format=txt")
+    stdout = await make_request(f"/jobs/{job_id}/stdout/?format=txt", controller=controller)
     if isinstance(stdout, str) and "Error" in stdout:
         return stdout
 
@@ -185,7 +458,7 @@ async def run_lightspeed_job_and_get_yaml(template_id: int, extra_vars: dict = {
 
 
 @mcp.tool()
-async def get_llm_response() -> str:
+async def get_llm_response(controller: str = None) -> str:
     """Give a LLM prompt for solving the event triggerred
     
     This function retrieves the stdout from an Ansible job and parses it to find
@@ -193,13 +466,13 @@ async def get_llm_response() -> str:
     """
 
     try:
-        job_id = await get_recent_prompt_job_id()
+        job_id = await get_recent_prompt_job_id(controller=controller)
     except Exception as e:
         return f"Error: {e}"
 
 
     # Get the job stdout
-    stdout = await make_request(f"{AAP_URL}/jobs/{job_id}/stdout/?format=txt")
+    stdout = await make_request(f"/jobs/{job_id}/stdout/?format=txt", controller=controller)
 
     if isinstance(stdout, str) and "Error" in stdout:
         return stdout
@@ -233,22 +506,22 @@ async def get_llm_response() -> str:
 
     
 @mcp.tool()
-async def list_events() -> Any:
+async def list_events(controller: str = None) -> Any:
     """List the most recent Event."""
-    return await make_request_eda(f"{EDA_URL}/audit-rules/")
+    return await make_request_eda("/audit-rules/", controller=controller)
 
 
 
 @mcp.tool()
-async def list_inventories() -> Any:
+async def list_inventories(controller: str = None) -> Any:
     """List all inventories in Ansible Automation Platform."""
-    return await make_request(f"{AAP_URL}/inventories/")
+    return await make_request("/inventories/", controller=controller)
 
 
 @mcp.tool()
-async def get_inventory(inventory_id: str) -> Any:
+async def get_inventory(inventory_id: str, controller: str = None) -> Any:
     """Get details of a specific inventory by ID."""
-    return await make_request(f"{AAP_URL}/inventories/{inventory_id}/")
+    return await make_request(f"/inventories/{inventory_id}/", controller=controller)
 
 
 ##@mcp.tool()
@@ -264,31 +537,155 @@ async def get_inventory(inventory_id: str) -> Any:
 ##    )
 
 @mcp.tool()
-async def run_job(name: str) -> Any:
+async def run_job(name: str, controller: str = None) -> Any:
     """Run a job template by name, optionally with extra_vars."""
     try:
-        template_id = await get_job_template_id(name)
+        template_id = await get_job_template_id(name, controller=controller)
     except Exception as e:
         return f"Error: Could not get Template ID: {e}"
 
     return await make_request(
-        f"{AAP_URL}/job_templates/{template_id}/launch/", method="POST")
+        f"/job_templates/{template_id}/launch/", method="POST", controller=controller)
 
 
 @mcp.tool()
-async def job_status(job_id: int) -> Any:
+async def job_status(job_id: int, controller: str = None) -> Any:
     """Check the status of a job by ID."""
-    return await make_request(f"{AAP_URL}/jobs/{job_id}/")
+    return await make_request(f"/jobs/{job_id}/", controller=controller)
 
 
 
 @mcp.tool()
-async def job_logs(job_id: int) -> str:
+async def job_logs(job_id: int, controller: str = None) -> str:
     """Retrieve logs for a job."""
-    return await make_request(f"{AAP_URL}/jobs/{job_id}/stdout/?format=txt")
+    return await make_request(f"/jobs/{job_id}/stdout/?format=txt", controller=controller)
+
+
+def failure_message(event_data: dict) -> str:
+    """Extract a short failure message from a job event's module result."""
+    res = event_data.get("res") or {}
+    if not isinstance(res, dict):
+        return str(res)[:FAILURE_SUMMARY_MESSAGE_LENGTH]
+    message = res.get("msg") or res.get("stderr") or res.get("reason") or res.get("stdout") or ""
+    if not isinstance(message, str):
+        message = json.dumps(message, default=str)
+    return message.strip()[:FAILURE_SUMMARY_MESSAGE_LENGTH]
 
 
+@mcp.tool()
+async def summarize_job_failures(job_id: int, max_hosts: int = 50, controller: str = None) -> Any:
+    """Summarize the failed tasks and hosts of a job without retrieving its full log.
+
+    Streams the failed job events and host summaries page by page and groups failures by task,
+    returning counts, sample hosts and distinct module messages. `failures` and `unreachable` count
+    hosts, matching the job host summaries; failed loop items are counted separately in
+    `item_failures`. Memory stays bounded regardless of the number of events in the job.
+    """
+    job = await make_request(f"/jobs/{job_id}/", controller=controller)
+    if not isinstance(job, dict):
+        return job
 
+    tasks = {}
+    events_scanned = 0
+    try:
+        async for event in iter_pages(
+            f"/jobs/{job_id}/job_events/?failed=true"
+            "&event__in=runner_on_failed,runner_on_async_failed,runner_item_on_failed,runner_on_unreachable"
+            "&order_by=counter",
+            controller=controller,
+        ):
+            events_scanned += 1
+            key = (event.get("play") or "", event.get("role") or "", event.get("task") or "")
+            task = tasks.get(key)
+            if task is None:
+                task = tasks[key] = {
+                    "play": key[0],
+                    "role": key[1],
+                    "task": key[2],
+                    "modules": set(),
+                    "failures": 0,
+                    "unreachable": 0,
+                    "item_failures": 0,
+                    "hosts": [],
+                    "messages": {},
+                    "other_messages": 0,
+                    "seen_hosts": set(),
+                }
+
+            event_data = event.get("event_data") or {}
+            if event_data.get("task_action") and len(task["modules"]) < FAILURE_SUMMARY_MAX_SAMPLES:
+                task["modules"].add(event_data["task_action"])
+
+            # A failed loop reports one event per failed item followed by one for the task itself,
+            # so count each host once per task and keep item events only for their messages.
+            # Memory grows with the number of failed hosts, not with the number of events.
+            host = event.get("host_name") or ""
+            if event.get("event") == "runner_item_on_failed":
+                task["item_failures"] += 1
+            elif host not in task["seen_hosts"]:
+                task["seen_hosts"].add(host)
+                if event.get("event") == "runner_on_unreachable":
+                    task["unreachable"] += 1
+                else:
+                    task["failures"] += 1
+                if len(task["hosts"]) < FAILURE_SUMMARY_MAX_SAMPLES:
+                    task["hosts"].append(host)
+
+            # The task-level result of a loop only carries a generic message, the items have the details
+            if isinstance(event_data.get("res"), dict) and "results" in event_data["res"]:
+                continue
+            message = failure_message(event_data)
+            if message in task["messages"]:
+                task["messages"][message] += 1
+            elif len(task["messages"]) < FAILURE_SUMMARY_MAX_SAMPLES:
+                task["messages"][message] = 1
+            else:
+                task["other_messages"] += 1
+    except ValueError as e:
+        return f"Error: Could not retrieve failed events for job {job_id}: {e}"
+
+    failed_hosts = []
+    failed_host_count = 0
+    try:
+        async for summary in iter_pages(
+            f"/jobs/{job_id}/job_host_summaries/?failed=true&order_by=host_name", controller=controller
+        ):
+            failed_host_count += 1
+            if len(failed_hosts) < max_hosts:
+                failed_hosts.append(
+                    {
+                        "host": summary.get("host_name"),
+                        "failures": summary.get("failures", 0),
+                        "unreachable": summary.get("dark", 0),
+                        "ok": summary.get("ok", 0),
+                        "changed": summary.get("changed", 0),
+                        "skipped": summary.get("skipped", 0),
+                    }
+                )
+    except ValueError as e:
+        return f"Error: Could not retrieve host summaries for job {job_id}: {e}"
+
+    failed_tasks = []
+    for task in tasks.values():
+        del task["seen_hosts"]
+        task["modules"] = sorted(task["modules"])
+        task["messages"] = [
+            {"message": message, "count": count}
+            for message, count in sorted(task["messages"].items(), key=lambda item: -item[1])
+        ]
+        failed_tasks.append(task)
+    failed_tasks.sort(key=lambda t: -(t["failures"] + t["unreachable"]))
+
+    return {
+        "job_id": job_id,
+        "name": job.get("name"),
+        "status": job.get("status"),
+        "failed_task_count": len(failed_tasks),
+        "failed_host_count": failed_host_count,
+        "events_scanned": events_scanned,
+        "failed_tasks": failed_tasks,
+        "failed_hosts": failed_hosts,
+    }
 
 
 @mcp.tool()
@@ -308,6 +705,7 @@ async def create_project(
     delete: bool = False,
     allow_branch_override: bool = False,
     track_submodules: bool = False,
+    controller: str = None,
 ) -> Any:
     """Create a new project in Ansible Automation Platform."""
 
@@ -333,7 +731,7 @@ async def create_project(
     if source_control_credential_id:
         payload["credential"] = source_control_credential_id
 
-    return await make_request(f"{AAP_URL}/projects/", method="POST", json=payload)
+    return await make_request("/projects/", method="POST", json=payload, controller=controller)
 
 
 @mcp.tool()
@@ -359,6 +757,7 @@ async def create_job_template(
     #provisioning_callback: bool = False,
     #enable_webhook: bool = False,
     #prevent_instance_group_fallback: bool = False,
+    controller: str = None,
 ) -> Any:
     """Create a new job template in Ansible Automation Platform."""
     
@@ -417,19 +816,19 @@ async def create_job_template(
     if extra_vars:
         payload["extra_vars"] = extra_vars
 
-    return await make_request(f"{AAP_URL}/job_templates/", method="POST", json=payload)
+    return await make_request("/job_templates/", method="POST", json=payload, controller=controller)
 
 
 @mcp.tool()
-async def list_inventory_sources() -> Any:
+async def list_inventory_sources(controller: str = None) -> Any:
     """List all inventory sources in Ansible Automation Platform."""
-    return await make_request(f"{AAP_URL}/inventory_sources/")
+    return await make_request("/inventory_sources/", controller=controller)
 
 
 @mcp.tool()
-async def get_inventory_source(inventory_source_id: int) -> Any:
+async def get_inventory_source(inventory_source_id: int, controller: str = None) -> Any:
     """Get details of a specific inventory source."""
-    return await make_request(f"{AAP_URL}/inventory_sources/{inventory_source_id}/")
+    return await make_request(f"/inventory_sources/{inventory_source_id}/", controller=controller)
 
 
 @mcp.tool()
@@ -441,6 +840,7 @@ async def create_inventory_source(
     source_vars: dict = None,
     update_on_launch: bool = True,
     timeout: int = 0,
+    controller: str = None,
 ) -> Any:
     """Create a dynamic inventory source. Claude will ask for the source type and credential before proceeding."""
     valid_sources = [
@@ -475,25 +875,27 @@ async def create_inventory_source(
         "update_on_launch": update_on_launch,
         "timeout": timeout,
     }
-    return await make_request(f"{AAP_URL}/inventory_sources/", method="POST", json=payload)
+    return await make_request("/inventory_sources/", method="POST", json=payload, controller=controller)
 
 
 @mcp.tool()
-async def update_inventory_source(inventory_source_id: int, update_data: dict) -> Any:
+async def update_inventory_source(inventory_source_id: int, update_data: dict, controller: str = None) -> Any:
     """Update an existing inventory source."""
-    return await make_request(f"{AAP_URL}/inventory_sources/{inventory_source_id}/", method="PATCH", json=update_data)
+    return await make_request(
+        f"/inventory_sources/{inventory_source_id}/", method="PATCH", json=update_data, controller=controller
+    )
 
 
 @mcp.tool()
-async def delete_inventory_source(inventory_source_id: int) -> Any:
+async def delete_inventory_source(inventory_source_id: int, controller: str = None) -> Any:
     """Delete an inventory source."""
-    return await make_request(f"{AAP_URL}/inventory_sources/{inventory_source_id}/", method="DELETE")
+    return await make_request(f"/inventory_sources/{inventory_source_id}/", method="DELETE", controller=controller)
 
 
 @mcp.tool()
-async def sync_inventory_source(inventory_source_id: int) -> Any:
+async def sync_inventory_source(inventory_source_id: int, controller: str = None) -> Any:
     """Manually trigger a sync for an inventory source."""
-    return await make_request(f"{AAP_URL}/inventory_sources/{inventory_source_id}/update/", method="POST")
+    return await make_request(f"/inventory_sources/{inventory_source_id}/update/", method="POST", controller=controller)
 
 
 @mcp.tool()
@@ -505,6 +907,7 @@ async def create_inventory(
     host_filter: str = "",
     variables: dict = None,
     prevent_instance_group_fallback: bool = False,
+    controller: str = None,
 ) -> Any:
     """Create an inventory in Ansible Automation Platform."""
     payload = {
@@ -516,13 +919,13 @@ async def create_inventory(
         "variables": variables,
         "prevent_instance_group_fallback": prevent_instance_group_fallback,
     }
-    return await make_request(f"{AAP_URL}/inventories/", method="POST", json=payload)
+    return await make_request("/inventories/", method="POST", json=payload, controller=controller)
 
 
 @mcp.tool()
-async def delete_inventory(inventory_id: int) -> Any:
+async def delete_inventory(inventory_id: int, controller: str = None) -> Any:
     """Delete an inventory from Ansible Automation Platform."""
-    return await make_request(f"{AAP_URL}/inventories/{inventory_id}/", method="DELETE")
+    return await make_request(f"/inventories/{inventory_id}/", method="DELETE", controller=controller)
 
 
 #@mcp.tool()
@@ -537,9 +940,9 @@ async def delete_inventory(inventory_id: int) -> Any:
  #   return unique_names
 
 @mcp.tool()
-async def list_job_templates() -> Any:
+async def list_job_templates(controller: str = None) -> Any:
     """List all unique job template names with their descriptions from Ansible Automation Platform."""
-    response = await make_request(f"{AAP_URL}/job_templates/")
+    response = await make_request("/job_templates/", controller=controller)
 
     job_templates = response.get("results", [])
     
@@ -559,53 +962,302 @@ async def list_job_templates() -> Any:
 
 
 @mcp.tool()
-async def get_job_template(template_id: int) -> Any:
+async def get_job_template(template_id: int, controller: str = None) -> Any:
     """Retrieve details of a specific job template."""
-    return await make_request(f"{AAP_URL}/job_templates/{template_id}/")
+    return await make_request(f"/job_templates/{template_id}/", controller=controller)
 
 @mcp.tool()
-async def list_jobs() -> Any:
+async def list_jobs(controller: str = None) -> Any:
     """List all jobs available in Ansible Automation Platform."""
-    return await make_request(f"{AAP_URL}/jobs/")
+    return await make_request("/jobs/", controller=controller)
 
 
 
 @mcp.tool()
-async def list_workflow_templates() -> Any:
+async def list_workflow_templates(controller: str = None) -> Any:
     """List all workflow jobs available in Ansible Automation Platform."""
-    return await make_request(f"{AAP_URL}/workflow_job_templates/")
+    return await make_request("/workflow_job_templates/", controller=controller)
 
 @mcp.tool()
-async def list_recent_jobs(hours: int = 24) -> Any:
+async def list_recent_jobs(hours: int = 24, controller: str = None) -> Any:
     """List all jobs executed in the last specified hours (default 24 hours)."""
     from datetime import datetime, timedelta
 
     time_filter = (datetime.utcnow() - timedelta(hours=hours)).isoformat() + "Z"
-    return await make_request(f"{AAP_URL}/jobs/?created__gte={time_filter}")
+    return await make_request(f"/jobs/?created__gte={time_filter}", controller=controller)
 
 
 # Host Management Tools
 @mcp.tool()
-async def list_hosts(inventory_id: int) -> Any:
+async def list_hosts(inventory_id: int, controller: str = None) -> Any:
     """List all hosts in a specific inventory."""
-    return await make_request(f"{AAP_URL}/inventories/{inventory_id}/hosts/")
+    return await make_request(f"/inventories/{inventory_id}/hosts/", controller=controller)
 
 
 @mcp.tool()
-async def get_host_details(host_id: int) -> Any:
+async def get_host_details(host_id: int, controller: str = None) -> Any:
     """Get detailed information about a specific host including facts and variables."""
-    return await make_request(f"{AAP_URL}/hosts/{host_id}/")
+    return await make_request(f"/hosts/{host_id}/", controller=controller)
+
+
+@mcp.tool()
+async def get_host_facts(host_id: int, controller: str = None) -> Any:
+    """Get gathered facts for a specific host.
+
+    The facts are recorded as a snapshot so that later calls to diff_host_facts can return only what changed.
+    """
+    facts = await make_request(f"/hosts/{host_id}/ansible_facts/", controller=controller)
+    if isinstance(facts, dict):
+        record_facts_snapshot(controller, host_id, facts)
+    return facts
+
+
+@mcp.tool()
+async def diff_host_facts(host_id: int, since: int | str = None, controller: str = None) -> Any:
+    """Get only the facts that changed on a host since an earlier snapshot.
+
+    Fetches the current facts, records them as a new snapshot and returns a structural diff
+    (added, removed and changed fact paths) against an earlier snapshot. `since` is either a
+    snapshot version number or an ISO timestamp, which selects the latest snapshot captured at
+    or before that time; when omitted, the latest recorded snapshot is used. Every response lists
+    the versions still available for the host.
+    """
+    facts = await make_request(f"/hosts/{host_id}/ansible_facts/", controller=controller)
+    if not isinstance(facts, dict):
+        return facts
+
+    key = (get_controller(controller).name, host_id)
+    history = FACTS_HISTORY.get(key)
+    baseline = None
+    if since is not None:
+        try:
+            baseline = find_facts_snapshot(history or deque(), since)
+        except ValueError:
+            return f"Error: '{since}' is neither a facts version number nor an ISO timestamp"
+        if baseline is None:
+            available = facts_versions(history or deque())
+            return f"Error: No facts snapshot matching '{since}' for host {host_id}. Available versions: {available}"
+    elif history:
+        baseline = history[-1]
+
+    current = record_facts_snapshot(controller, host_id, facts)
+    available = facts_versions(FACTS_HISTORY[key])
+    if baseline is None:
+        return {
+            "host_id": host_id,
+            "version": current["version"],
+            "captured_at": current["captured_at"],
+            "available_versions": available,
+            "message": "No earlier snapshot for this host; current facts recorded as the baseline.",
+        }
+
+    diff = diff_facts(baseline["facts"], current["facts"])
+    return {
+        "host_id": host_id,
+        "since_version": baseline["version"],
+        "since_captured_at": baseline["captured_at"],
+        "version": current["version"],
+        "captured_at": current["captured_at"],
+        "changed_keys": sum(len(section) for section in diff.values()),
+        "available_versions": available,
+        "diff": diff,
+    }
 
 
 @mcp.tool()
-async def get_host_facts(host_id: int) -> Any:
-    """Get gathered facts for a specific host."""
-    return await make_request(f"{AAP_URL}/hosts/{host_id}/ansible_facts/")
+async def diff_inventory_facts(inventory_id: int, fact_paths: list[str], controller: str = None) -> Any:
+    """Find hosts in an inventory whose given fact paths changed since the previous call.
+
+    Fact paths are dotted, e.g. ["ansible_distribution_version", "ansible_default_ipv4.address"].
+    Each call compares against a baseline of the requested values kept per inventory and fact
+    paths, then replaces it. Hosts missing from the baseline are counted in `new_baselines` but
+    not reported as changed; `baseline` says whether the baseline was missing or evicted.
+    """
+    try:
+        hosts = [host async for host in iter_pages(f"/inventories/{inventory_id}/hosts/", controller=controller)]
+    except ValueError as e:
+        return f"Error: Could not list hosts for inventory {inventory_id}: {e}"
+
+    semaphore = asyncio.Semaphore(FLEET_CONCURRENCY)
+
+    async def host_values(host: dict) -> Any:
+        async with semaphore:
+            facts = await make_request(f"/hosts/{host['id']}/ansible_facts/", controller=controller)
+        if not isinstance(facts, dict):
+            return facts
+        # Keep only the requested values rather than whole facts documents
+        return [get_fact(facts, path) for path in fact_paths]
+
+    results = await asyncio.gather(*(host_values(host) for host in hosts))
+
+    key = (get_controller(controller).name, inventory_id, tuple(fact_paths))
+    baseline = FLEET_FACTS_BASELINES.get(key)
+    if baseline is not None:
+        baseline_status = {"captured_at": baseline["captured_at"]}
+    elif key in FLEET_FACTS_EVICTED:
+        baseline_status = {
+            "evicted": True,
+            "message": "The previous baseline was evicted (FLEET_FACTS_MAX_BASELINES); changes cannot be reported.",
+        }
+    else:
+        baseline_status = {"message": "No earlier baseline; current values recorded as the baseline."}
+    previous = baseline["hosts"] if baseline else {}
+
+    current, changed, errors, new_baselines = {}, [], [], 0
+    for host, values in zip(hosts, results, strict=True):
+        if not isinstance(values, list):
+            errors.append({"host_id": host["id"], "name": host.get("name"), "error": values})
+            # Keep the earlier values so the host is still compared on the next call
+            if host["id"] in previous:
+                current[host["id"]] = previous[host["id"]]
+            continue
+
+        current[host["id"]] = values
+        if host["id"] not in previous:
+            new_baselines += 1
+            continue
+        changes = {
+            path: {"old": old, "new": new}
+            for path, old, new in zip(fact_paths, previous[host["id"]], values, strict=True)
+            if old != new
+        }
+        if changes:
+            changed.append({"host_id": host["id"], "name": host.get("name"), "changes": changes})
+
+    FLEET_FACTS_BASELINES[key] = {"captured_at": datetime.now(UTC).isoformat(), "hosts": current}
+    FLEET_FACTS_BASELINES.move_to_end(key)
+    FLEET_FACTS_EVICTED.pop(key, None)
+    while len(FLEET_FACTS_BASELINES) > FLEET_FACTS_MAX_BASELINES:
+        evicted_key, _ = FLEET_FACTS_BASELINES.popitem(last=False)
+        FLEET_FACTS_EVICTED[evicted_key] = None
+    while len(FLEET_FACTS_EVICTED) > FLEET_FACTS_MAX_BASELINES:
+        FLEET_FACTS_EVICTED.popitem(last=False)
+
+    return {
+        "inventory_id": inventory_id,
+        "fact_paths": fact_paths,
+        "baseline": baseline_status,
+        "hosts_checked": len(hosts),
+        "new_baselines": new_baselines,
+        "changed_hosts": changed,
+        "errors": errors,
+    }
+
+
+@mcp.tool()
+async def inventory_statistics(
+    inventory_id: int, fact_paths: list[str] = None, top: int = 20, refresh: bool = False, controller: str = None
+) -> Any:
+    """Compute aggregate statistics for an inventory on the server.
+
+    Returns host counts, enabled and failing hosts, per-group host and failing counts, and a
+    histogram of values for each dotted fact path (e.g. ["ansible_distribution", "ansible_distribution_version"]),
+    limited to the `top` most common values. Hosts whose facts could not be fetched are reported in
+    `facts_errors` instead of the histograms.
+
+    Results are cached until the inventory is modified or for INVENTORY_STATS_TTL seconds. Fact
+    gathering and group membership changes do not always update the inventory, so cached fact
+    histograms and per-group failing counts can lag behind it; pass refresh=True to recompute.
+    Results with fetch errors are never cached.
+    """
+    fact_paths = fact_paths or []
+    inventory = await make_request(f"/inventories/{inventory_id}/", controller=controller)
+    if not isinstance(inventory, dict):
+        return inventory
+
+    controller_name = get_controller(controller).name
+    cache_key = (controller_name, inventory_id, tuple(fact_paths), top)
+    now = time.monotonic()
+    for key, entry in list(INVENTORY_STATS_CACHE.items()):
+        expired = now - entry["cached_at"] >= INVENTORY_STATS_TTL
+        superseded = key[:2] == (controller_name, inventory_id) and entry["modified"] != inventory.get("modified")
+        if expired or superseded:
+            del INVENTORY_STATS_CACHE[key]
+
+    cached = INVENTORY_STATS_CACHE.get(cache_key)
+    if cached and not refresh:
+        return {**cached["result"], "cached": True}
+
+    semaphore = asyncio.Semaphore(FLEET_CONCURRENCY)
+
+    async def collect(path: str) -> list:
+        async with semaphore:
+            return [item async for item in iter_pages(path, controller=controller)]
+
+    async def host_facts(host_id: int) -> list:
+        async with semaphore:
+            facts = await make_request(f"/hosts/{host_id}/ansible_facts/", controller=controller)
+        if not isinstance(facts, dict):
+            return None
+        # Keep only the requested values rather than whole facts documents
+        return [get_fact(facts, path) for path in fact_paths]
+
+    try:
+        hosts, groups = await asyncio.gather(
+            collect(f"/inventories/{inventory_id}/hosts/"), collect(f"/inventories/{inventory_id}/groups/")
+        )
+        group_members = await asyncio.gather(*(collect(f"/groups/{group['id']}/all_hosts/") for group in groups))
+    except ValueError as e:
+        return f"Error: Could not retrieve inventory {inventory_id}: {e}"
+    if fact_paths:
+        host_fact_values = await asyncio.gather(*(host_facts(host["id"]) for host in hosts))
+    else:
+        host_fact_values = [[] for _ in hosts]
+
+    failing = {host["id"] for host in hosts if host.get("has_active_failures")}
+    group_stats = {}
+    for group, members in zip(groups, group_members, strict=True):
+        member_ids = {member["id"] for member in members}
+        group_stats[group["name"]] = {"hosts": len(member_ids), "failing": len(member_ids & failing)}
+
+    histograms = [Counter() for _ in fact_paths]
+    facts_error_host_ids = []
+    for host, values in zip(hosts, host_fact_values, strict=True):
+        if values is None:
+            facts_error_host_ids.append(host["id"])
+            continue
+        # Key on the JSON encoding so that True, 1 and 1.0 are counted as distinct values
+        for histogram, value in zip(histograms, values, strict=True):
+            histogram[json.dumps(value, sort_keys=True, default=str)] += 1
+
+    fact_stats = {}
+    for path, histogram in zip(fact_paths, histograms, strict=True):
+        most_common = histogram.most_common(top)
+        fact_stats[path] = {
+            "distinct": len(histogram),
+            "values": [{"value": json.loads(value), "hosts": count} for value, count in most_common],
+            "other": sum(histogram.values()) - sum(count for _, count in most_common),
+        }
+
+    result = {
+        "inventory_id": inventory_id,
+        "name": inventory.get("name"),
+        "inventory_modified": inventory.get("modified"),
+        "computed_at": datetime.now(UTC).isoformat(),
+        "hosts": len(hosts),
+        "enabled": sum(1 for host in hosts if host.get("enabled")),
+        "failing": len(failing),
+        "groups": dict(sorted(group_stats.items(), key=lambda item: -item[1]["failing"])),
+        "facts": fact_stats,
+        "facts_errors": {"hosts": len(facts_error_host_ids), "host_ids": facts_error_host_ids[:top]},
+    }
+    if not facts_error_host_ids:
+        INVENTORY_STATS_CACHE[cache_key] = {
+            "modified": inventory.get("modified"),
+            "cached_at": now,
+            "result": result,
+        }
+    return {**result, "cached": False}
 
 
 @mcp.tool()
 async def add_host_to_inventory(
-    inventory_id: int, hostname: str, description: str = "", variables: dict = None, enabled: bool = True
+    inventory_id: int,
+    hostname: str,
+    description: str = "",
+    variables: dict = None,
+    enabled: bool = True,
+    controller: str = None,
 ) -> Any:
     """Add a new host to an inventory with optional variables."""
     payload = {
@@ -615,65 +1267,70 @@ async def add_host_to_inventory(
         "enabled": enabled,
         "variables": variables or {},
     }
-    return await make_request(f"{AAP_URL}/hosts/", method="POST", json=payload)
+    return await make_request("/hosts/", method="POST", json=payload, controller=controller)
 
 
 @mcp.tool()
-async def update_host(host_id: int, update_data: dict) -> Any:
+async def update_host(host_id: int, update_data: dict, controller: str = None) -> Any:
     """Update host settings including variables, description, or enabled status."""
-    return await make_request(f"{AAP_URL}/hosts/{host_id}/", method="PATCH", json=update_data)
+    return await make_request(f"/hosts/{host_id}/", method="PATCH", json=update_data, controller=controller)
 
 
 @mcp.tool()
-async def delete_host(host_id: int) -> Any:
+async def delete_host(host_id: int, controller: str = None) -> Any:
     """Delete a host from inventory."""
-    return await make_request(f"{AAP_URL}/hosts/{host_id}/", method="DELETE")
+    return await make_request(f"/hosts/{host_id}/", method="DELETE", controller=controller)
 
 
 @mcp.tool()
-async def get_failed_hosts(inventory_id: int) -> Any:
+async def get_failed_hosts(inventory_id: int, controller: str = None) -> Any:
     """Get list of hosts with active failures in an inventory."""
-    return await make_request(f"{AAP_URL}/inventories/{inventory_id}/hosts/?has_active_failures=true")
+    return await make_request(f"/inventories/{inventory_id}/hosts/?has_active_failures=true", controller=controller)
 
 
 @mcp.tool()
-async def list_groups(inventory_id: int) -> Any:
+async def list_groups(inventory_id: int, controller: str = None) -> Any:
     """List all groups in a specific inventory."""
-    return await make_request(f"{AAP_URL}/inventories/{inventory_id}/groups/")
+    return await make_request(f"/inventories/{inventory_id}/groups/", controller=controller)
 
 
 @mcp.tool()
-async def get_group_details(group_id: int) -> Any:
+async def get_group_details(group_id: int, controller: str = None) -> Any:
     """Get detailed information about a specific group."""
-    return await make_request(f"{AAP_URL}/groups/{group_id}/")
+    return await make_request(f"/groups/{group_id}/", controller=controller)
 
 
 @mcp.tool()
-async def create_group(inventory_id: int, name: str, description: str = "", variables: dict = None) -> Any:
+async def create_group(
+    inventory_id: int, name: str, description: str = "", variables: dict = None, controller: str = None
+) -> Any:
     """Create a new group in an inventory."""
     payload = {"name": name, "description": description, "inventory": inventory_id, "variables": variables or {}}
-    return await make_request(f"{AAP_URL}/groups/", method="POST", json=payload)
+    return await make_request("/groups/", method="POST", json=payload, controller=controller)
 
 
 @mcp.tool()
-async def add_host_to_group(group_id: int, host_id: int) -> Any:
+async def add_host_to_group(group_id: int, host_id: int, controller: str = None) -> Any:
     """Add a host to a group."""
     payload = {"id": host_id}
-    return await make_request(f"{AAP_URL}/groups/{group_id}/hosts/", method="POST", json=payload)
+    return await make_request(f"/groups/{group_id}/hosts/", method="POST", json=payload, controller=controller)
 
 
 @mcp.tool()
-async def remove_host_from_group(group_id: int, host_id: int) -> Any:
+async def remove_host_from_group(group_id: int, host_id: int, controller: str = None) -> Any:
     """Remove a host from a group."""
     return await make_request(
-        f"{AAP_URL}/groups/{group_id}/hosts/", method="POST", json={"id": host_id, "disassociate": True}
+        f"/groups/{group_id}/hosts/",
+        method="POST",
+        json={"id": host_id, "disassociate": True},
+        controller=controller,
     )
 
 
 @mcp.tool()
-async def get_host_groups(host_id: int) -> Any:
+async def get_host_groups(host_id: int, controller: str = None) -> Any:
     """Get all groups that a host belongs to."""
-    return await make_request(f"{AAP_URL}/hosts/{host_id}/groups/")
+    return await make_request(f"/hosts/{host_id}/groups/", controller=controller)
 
 
 @mcp.tool()
@@ -685,6 +1342,7 @@ async def run_adhoc_command(
     credential_id: int = None,
     become_enabled: bool = False,
     verbosity: int = 0,
+    controller: str = None,
 ) -> Any:
     """Run an ad-hoc Ansible command against inventory hosts."""
     payload = {
@@ -698,56 +1356,156 @@ async def run_adhoc_command(
     if credential_id:
         payload["credential"] = credential_id
 
-    return await make_request(f"{AAP_URL}/ad_hoc_commands/", method="POST", json=payload)
+    return await make_request("/ad_hoc_commands/", method="POST", json=payload, controller=controller)
 
 
 @mcp.tool()
-async def get_adhoc_command_status(adhoc_id: int) -> Any:
+async def get_adhoc_command_status(adhoc_id: int, controller: str = None) -> Any:
     """Get status of an ad-hoc command."""
-    return await make_request(f"{AAP_URL}/ad_hoc_commands/{adhoc_id}/")
+    return await make_request(f"/ad_hoc_commands/{adhoc_id}/", controller=controller)
 
 
 @mcp.tool()
-async def get_adhoc_command_output(adhoc_id: int) -> Any:
+async def get_adhoc_command_output(adhoc_id: int, controller: str = None) -> Any:
     """Get output/logs from an ad-hoc command."""
-    return await make_request(f"{AAP_URL}/ad_hoc_commands/{adhoc_id}/stdout/?format=txt")
+    return await make_request(f"/ad_hoc_commands/{adhoc_id}/stdout/?format=txt", controller=controller)
+
+
+@mcp.tool()
+async def run_adhoc_command_and_collect(
+    inventory_ids: list[int],
+    module_name: str,
+    module_args: str = "",
+    limit: str = "",
+    credential_id: int = None,
+    become_enabled: bool = False,
+    timeout: int = 600,
+    stdout_chars: int = 200,
+    controller: str = None,
+) -> Any:
+    """Run an ad-hoc command on one or more inventories, wait for it and return per-host results.
+
+    Launches one ad-hoc command per inventory concurrently and builds a map of
+    host -> status, rc, changed and a stdout excerpt from the command events,
+    e.g. for fleet checks such as module_name="command", module_args="systemctl is-active httpd".
+    Commands still running after `timeout` seconds, or whose status cannot be polled, are canceled.
+    In the summary, `hosts` counts distinct host names while `results` and the status counts cover
+    every inventory's results.
+    """
+    payload = {
+        "module_name": module_name,
+        "module_args": module_args,
+        "limit": limit,
+        "become_enabled": become_enabled,
+    }
+    if credential_id:
+        payload["credential"] = credential_id
+
+    async def cancel_adhoc_command(adhoc_id: int, error: Exception) -> str:
+        """Cancel a command we stopped waiting for and describe what happened to it."""
+        cancel = await make_request(f"/ad_hoc_commands/{adhoc_id}/cancel/", method="POST", controller=controller)
+        if not (isinstance(cancel, str) and cancel.startswith("Error")):
+            return f"{error}; the command was canceled"
+
+        # Cancel is refused once the command has finished, so check before reporting it as running
+        command = await make_request(f"/ad_hoc_commands/{adhoc_id}/", controller=controller)
+        status = command.get("status") if isinstance(command, dict) else None
+        if status in FINISHED_JOB_STATUSES:
+            return f"{error}; the command already finished with status '{status}'"
+        if status:
+            return f"{error}; could not cancel it, the command is still '{status}': {cancel}"
+        return f"{error}; could not cancel it and its status is unknown, it may still be running: {cancel}"
+
+    async def run_on_inventory(inventory_id: int) -> dict:
+        launch = await make_request(
+            "/ad_hoc_commands/",
+            method="POST",
+            json={**payload, "inventory": inventory_id},
+            controller=controller,
+        )
+        if not isinstance(launch, dict) or not launch.get("id"):
+            return {"error": f"Could not launch ad-hoc command: {launch}"}
+        adhoc_id = launch["id"]
+
+        try:
+            command = await wait_for_job(f"/ad_hoc_commands/{adhoc_id}/", timeout=timeout, controller=controller)
+        except (ValueError, TimeoutError) as e:
+            return {"adhoc_id": adhoc_id, "error": await cancel_adhoc_command(adhoc_id, e)}
+
+        hosts = {}
+        try:
+            async for event in iter_pages(
+                f"/ad_hoc_commands/{adhoc_id}/events/"
+                "?event__in=runner_on_ok,runner_on_failed,runner_on_unreachable,runner_on_skipped",
+                controller=controller,
+            ):
+                res = (event.get("event_data") or {}).get("res") or {}
+                if not isinstance(res, dict):
+                    res = {"msg": str(res)}
+                output = res.get("stdout") or res.get("msg") or res.get("stderr") or ""
+                if not isinstance(output, str):
+                    output = json.dumps(output, default=str)
+                hosts[event.get("host_name")] = {
+                    "status": event.get("event", "").removeprefix("runner_on_"),
+                    "rc": res.get("rc"),
+                    "changed": bool(event.get("changed") or res.get("changed")),
+                    "stdout": output[:stdout_chars],
+                }
+        except ValueError as e:
+            return {"adhoc_id": adhoc_id, "status": command.get("status"), "error": str(e)}
+
+        return {"adhoc_id": adhoc_id, "status": command.get("status"), "hosts": hosts}
+
+    results = await asyncio.gather(*(run_on_inventory(inventory_id) for inventory_id in inventory_ids))
+
+    summary = {"hosts": 0, "results": 0, "ok": 0, "failed": 0, "unreachable": 0, "skipped": 0, "changed": 0}
+    host_names = set()
+    for result in results:
+        for name, host in result.get("hosts", {}).items():
+            host_names.add(name)
+            summary["results"] += 1
+            summary[host["status"]] = summary.get(host["status"], 0) + 1
+            summary["changed"] += host["changed"]
+    summary["hosts"] = len(host_names)
+
+    return {"summary": summary, "inventories": dict(zip(inventory_ids, results, strict=True))}
 
 
 # Project Management Tools
 @mcp.tool()
-async def list_projects() -> Any:
+async def list_projects(controller: str = None) -> Any:
     """List all projects in Ansible Automation Platform."""
-    return await make_request(f"{AAP_URL}/projects/")
+    return await make_request("/projects/", controller=controller)
 
 
 @mcp.tool()
-async def get_project(project_id: int) -> Any:
+async def get_project(project_id: int, controller: str = None) -> Any:
     """Get details of a specific project by ID."""
-    return await make_request(f"{AAP_URL}/projects/{project_id}/")
+    return await make_request(f"/projects/{project_id}/", controller=controller)
 
 
 @mcp.tool()
-async def list_project_updates() -> Any:
+async def list_project_updates(controller: str = None) -> Any:
     """List all project update jobs (SCM sync operations)."""
-    return await make_request(f"{AAP_URL}/project_updates/")
+    return await make_request("/project_updates/", controller=controller)
 
 
 @mcp.tool()
-async def get_project_update(update_id: int) -> Any:
+async def get_project_update(update_id: int, controller: str = None) -> Any:
     """Get status and details of a specific project update job."""
-    return await make_request(f"{AAP_URL}/project_updates/{update_id}/")
+    return await make_request(f"/project_updates/{update_id}/", controller=controller)
 
 
 @mcp.tool()
-async def get_project_update_logs(update_id: int) -> str:
+async def get_project_update_logs(update_id: int, controller: str = None) -> str:
     """Get logs from a project update job (SCM sync operation)."""
-    return await make_request(f"{AAP_URL}/project_updates/{update_id}/stdout/?format=txt")
+    return await make_request(f"/project_updates/{update_id}/stdout/?format=txt", controller=controller)
 
 
 @mcp.tool()
-async def update_project(project_id: int) -> Any:
+async def update_project(project_id: int, controller: str = None) -> Any:
     """Trigger a project update (SCM sync) for a specific project."""
-    return await make_request(f"{AAP_URL}/projects/{project_id}/update/", method="POST")
+    return await make_request(f"/projects/{project_id}/update/", method="POST", controller=controller)
 
 
 
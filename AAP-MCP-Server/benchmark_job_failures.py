@@ -0,0 +1,57 @@
+"""Compare summarize_job_failures with retrieving the full job stdout.
+
+Runs both approaches against a live controller and reports the size of the payload
+handed to the LLM and the median wall-clock latency of each over several runs.
+
+Usage:
+    AAP_URL=... AAP_TOKEN=... python benchmark_job_failures.py [--runs N] <job_id> [<job_id> ...]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+# Imports the MCP server module in this directory, not ansible-core
+import ansible as server
+
+
+async def measure(tool, job_id: int) -> tuple[int, float]:
+    """Return the payload size in bytes and the latency in seconds of one tool call."""
+    start = time.perf_counter()
+    result = await tool(job_id)
+    elapsed = time.perf_counter() - start
+    payload = result if isinstance(result, str) else json.dumps(result)
+    return len(payload.encode()), elapsed
+
+
+async def main(job_ids: list[int], runs: int) -> None:
+    # Warm up the pooled connection so neither approach pays for TLS and connection setup
+    await server.job_status(job_ids[0])
+
+    print(f"{'job':>8} {'stdout bytes':>14} {'summary bytes':>14} {'reduction':>10} {'stdout s':>9} {'summary s':>10}")
+    for job_id in job_ids:
+        timings = {server.job_logs: [], server.summarize_job_failures: []}
+        sizes = {}
+        for run in range(runs):
+            # Alternate the order so caching on the controller does not favour either approach
+            order = [server.job_logs, server.summarize_job_failures]
+            for tool in order if run % 2 == 0 else reversed(order):
+                sizes[tool], elapsed = await measure(tool, job_id)
+                timings[tool].append(elapsed)
+
+        log_bytes, summary_bytes = sizes[server.job_logs], sizes[server.summarize_job_failures]
+        reduction = 1 - summary_bytes / log_bytes if log_bytes else 0
+        print(
+            f"{job_id:>8} {log_bytes:>14} {summary_bytes:>14} {reduction:>9.1%} "
+            f"{statistics.median(timings[server.job_logs]):>9.2f} "
+            f"{statistics.median(timings[server.summarize_job_failures]):>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("job_ids", type=int, nargs="+", help="IDs of failed jobs to summarize")
+    parser.add_argument("--runs", type=int, default=5, help="runs per job; the median latency is reported")
+    args = parser.parse_args()
+    asyncio.run(main(args.job_ids, args.runs))
@@ -0,0 +1,40 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("AAP_TOKEN", "test-token")
+os.environ.setdefault("AAP_URL", "https://aap.example.com/api/controller/v2")
+
+# Import the MCP server module next to this directory rather than ansible-core
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ansible  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def reset_state(monkeypatch):
+    """Start every test with empty in-memory caches."""
+    ansible.FACTS_HISTORY.clear()
+    ansible.INVENTORY_STATS_CACHE.clear()
+    monkeypatch.setattr(ansible, "facts_history_bytes", 0)
+    monkeypatch.setattr(ansible, "FACTS_VERSIONS", ansible.itertools.count(1))
+    ansible.FLEET_FACTS_BASELINES.clear()
+    ansible.FLEET_FACTS_EVICTED.clear()
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Route make_request calls to a handler taking (path, method, json) and record the paths requested."""
+    calls = []
+
+    def install(handler):
+        async def fake_request(path, method="GET", json=None, controller=None):
+            calls.append(path)
+            return handler(path, method, json)
+
+        monkeypatch.setattr(ansible, "make_request", fake_request)
+        return calls
+
+    return install
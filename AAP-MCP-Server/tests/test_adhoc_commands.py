@@ -0,0 +1,78 @@
+import ansible
+
+
+def adhoc_handler(events, status="successful"):
+    def handler(path, method, body):
+        if method == "POST" and path == "/ad_hoc_commands/":
+            return {"id": body["inventory"] * 10}
+        if path.endswith("/cancel/"):
+            return ""
+        if "/events/" in path:
+            return {"results": events, "next": None}
+        return {"id": 10, "status": status, "event_processing_finished": True}
+
+    return handler
+
+
+def host_event(host, event, rc, stdout):
+    return {"host_name": host, "event": event, "changed": False, "event_data": {"res": {"rc": rc, "stdout": stdout}}}
+
+
+async def test_results_are_mapped_per_host_and_hosts_deduplicated(api):
+    events = [
+        host_event("web1", "runner_on_ok", 0, "active"),
+        host_event("web2", "runner_on_failed", 3, "inactive"),
+    ]
+    api(adhoc_handler(events))
+
+    result = await ansible.run_adhoc_command_and_collect([1, 2], "command", "systemctl is-active httpd")
+
+    web2 = result["inventories"][1]["hosts"]["web2"]
+    assert web2 == {"status": "failed", "rc": 3, "changed": False, "stdout": "inactive"}
+    assert result["summary"]["hosts"] == 2
+    assert result["summary"]["results"] == 4
+    assert result["summary"]["ok"] == 2
+    assert result["summary"]["failed"] == 2
+
+
+async def test_timed_out_command_is_canceled(api, monkeypatch):
+    async def time_out(path, timeout=600, max_interval=10.0, controller=None):
+        raise TimeoutError("Job 10 still 'running' after 1 seconds")
+
+    monkeypatch.setattr(ansible, "wait_for_job", time_out)
+    calls = api(adhoc_handler([], status="running"))
+
+    result = await ansible.run_adhoc_command_and_collect([1], "ping", timeout=1)
+
+    assert "/ad_hoc_commands/10/cancel/" in calls
+    assert result["inventories"][1]["error"].endswith("the command was canceled")
+
+
+async def test_polling_error_cancels_command(api, monkeypatch):
+    async def fail(path, timeout=600, max_interval=10.0, controller=None):
+        raise ValueError("Error 502: Bad Gateway")
+
+    monkeypatch.setattr(ansible, "wait_for_job", fail)
+    calls = api(adhoc_handler([], status="running"))
+
+    result = await ansible.run_adhoc_command_and_collect([1], "ping")
+
+    assert "/ad_hoc_commands/10/cancel/" in calls
+    assert result["inventories"][1]["error"] == "Error 502: Bad Gateway; the command was canceled"
+
+
+async def test_refused_cancel_of_finished_command_is_not_reported_as_running(api, monkeypatch):
+    async def time_out(path, timeout=600, max_interval=10.0, controller=None):
+        raise TimeoutError("Job 10 still 'running' after 1 seconds")
+
+    def handler(path, method, body):
+        if path.endswith("/cancel/"):
+            return "Error 405: Method Not Allowed"
+        return adhoc_handler([], status="successful")(path, method, body)
+
+    monkeypatch.setattr(ansible, "wait_for_job", time_out)
+    api(handler)
+
+    result = await ansible.run_adhoc_command_and_collect([1], "ping", timeout=1)
+
+    assert result["inventories"][1]["error"].endswith("the command already finished with status 'successful'")
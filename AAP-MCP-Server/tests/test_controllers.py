@@ -0,0 +1,62 @@
+import pytest
+
+import ansible
+
+
+def test_get_controller_falls_back_to_default():
+    assert ansible.get_controller().name == ansible.DEFAULT_CONTROLLER
+    assert ansible.get_controller(None) is ansible.get_controller(ansible.DEFAULT_CONTROLLER)
+
+
+def test_get_controller_reports_unknown_name():
+    with pytest.raises(ValueError, match="Unknown controller 'west'. Available controllers: default"):
+        ansible.get_controller("west")
+
+
+def test_unknown_default_controller_is_reported(monkeypatch):
+    monkeypatch.setattr(ansible, "DEFAULT_CONTROLLER", "defualt")
+
+    with pytest.raises(ValueError, match="Unknown controller 'defualt'"):
+        ansible.get_controller()
+
+
+def test_load_controllers_reads_additional_controllers(monkeypatch):
+    monkeypatch.setattr(
+        ansible,
+        "AAP_CONTROLLERS",
+        '{"east": {"aap_url": "https://east.example.com/api/controller/v2", "aap_token": "t", '
+        '"max_concurrent_requests": 5}}',
+    )
+
+    controllers = ansible.load_controllers()
+
+    assert list(controllers) == ["default", "east"]
+    assert controllers["east"].max_concurrent_requests == 5
+    assert controllers["east"].headers["Authorization"] == "Bearer t"
+    assert controllers["east"].headers_eda["Authorization"] == "Bearer t"
+
+
+@pytest.mark.parametrize(
+    ("config", "error"),
+    [
+        ('{"east": {"aap_token": "t"}}', "AAP_CONTROLLERS entry 'east' is missing aap_url"),
+        ('{"east": "https://east.example.com"}', "AAP_CONTROLLERS entry 'east' must be an object"),
+        ('{"default": {"aap_url": "https://x", "aap_token": "t"}}', "entry 'default' collides"),
+    ],
+)
+def test_load_controllers_rejects_invalid_entries(monkeypatch, config, error):
+    monkeypatch.setattr(ansible, "AAP_CONTROLLERS", config)
+
+    with pytest.raises(ValueError, match=error):
+        ansible.load_controllers()
+
+
+async def test_throttle_spaces_requests():
+    controller = ansible.Controller("east", "https://east.example.com", "t", max_requests_per_second=50)
+    loop = ansible.asyncio.get_running_loop()
+
+    start = loop.time()
+    for _ in range(3):
+        await controller.throttle()
+
+    assert loop.time() - start >= 2 / 50
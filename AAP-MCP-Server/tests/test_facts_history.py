@@ -0,0 +1,123 @@
+import ansible
+
+
+def test_diff_facts_reports_added_removed_and_changed_paths():
+    old = {"os": "rhel", "ipv4": {"address": "10.0.0.1", "gateway": "10.0.0.254"}, "swap": 0}
+    new = {"os": "rhel", "ipv4": {"address": "10.0.0.2", "gateway": "10.0.0.254"}, "selinux": "enforcing"}
+
+    diff = ansible.diff_facts(old, new)
+
+    assert diff == {
+        "added": {"selinux": "enforcing"},
+        "removed": {"swap": 0},
+        "changed": {"ipv4.address": {"old": "10.0.0.1", "new": "10.0.0.2"}},
+    }
+
+
+def test_record_facts_snapshot_skips_unchanged_facts():
+    first = ansible.record_facts_snapshot(None, 1, {"os": "rhel"})
+    second = ansible.record_facts_snapshot(None, 1, {"os": "rhel"})
+
+    assert first is second
+    assert len(ansible.FACTS_HISTORY[("default", 1)]) == 1
+
+
+def test_record_facts_snapshot_evicts_oldest_versions(monkeypatch):
+    monkeypatch.setattr(ansible, "FACTS_HISTORY_MAX_VERSIONS", 3)
+
+    for release in range(5):
+        ansible.record_facts_snapshot(None, 1, {"release": release})
+
+    history = ansible.FACTS_HISTORY[("default", 1)]
+    assert [s["version"] for s in history] == [3, 4, 5]
+    assert ansible.facts_history_bytes == sum(s["size"] for s in history)
+
+
+def test_record_facts_snapshot_evicts_least_recently_used_hosts(monkeypatch):
+    facts = {"data": "x" * 100}
+    size = len(ansible.json.dumps(facts))
+    monkeypatch.setattr(ansible, "FACTS_HISTORY_MAX_TOTAL_BYTES", 2 * size)
+
+    ansible.record_facts_snapshot(None, 1, facts)
+    ansible.record_facts_snapshot(None, 2, facts)
+    ansible.record_facts_snapshot(None, 1, facts)
+    ansible.record_facts_snapshot(None, 3, facts)
+
+    assert list(ansible.FACTS_HISTORY) == [("default", 1), ("default", 3)]
+    assert ansible.facts_history_bytes == 2 * size
+
+
+async def test_diff_host_facts_accepts_version_or_timestamp(api):
+    facts = {"os": "rhel8"}
+    api(lambda path, method, body: dict(facts))
+
+    baseline = await ansible.diff_host_facts(1)
+    facts["os"] = "rhel9"
+    await ansible.diff_host_facts(1)
+
+    by_version = await ansible.diff_host_facts(1, since=baseline["version"])
+    by_timestamp = await ansible.diff_host_facts(1, since=baseline["captured_at"])
+
+    assert baseline["available_versions"][0]["version"] == 1
+    for result in (by_version, by_timestamp):
+        assert result["since_version"] == 1
+        assert result["diff"]["changed"] == {"os": {"old": "rhel8", "new": "rhel9"}}
+
+
+async def test_diff_host_facts_reports_unknown_version(api):
+    api(lambda path, method, body: {"os": "rhel"})
+
+    await ansible.diff_host_facts(1)
+    result = await ansible.diff_host_facts(1, since=7)
+
+    assert result.startswith("Error: No facts snapshot matching '7'")
+
+
+def test_versions_are_not_reused_after_eviction(monkeypatch):
+    facts = {"data": "x" * 100}
+    monkeypatch.setattr(ansible, "FACTS_HISTORY_MAX_TOTAL_BYTES", len(ansible.json.dumps(facts)))
+
+    first = ansible.record_facts_snapshot(None, 1, facts)
+    ansible.record_facts_snapshot(None, 2, facts)
+    again = ansible.record_facts_snapshot(None, 1, facts)
+
+    assert list(ansible.FACTS_HISTORY) == [("default", 1)]
+    assert again["version"] > first["version"]
+    assert ansible.find_facts_snapshot(ansible.FACTS_HISTORY[("default", 1)], first["version"]) is None
+
+
+def fleet_handler(facts_by_host):
+    def handler(path, method, body):
+        if path.startswith("/inventories/"):
+            return {"results": [{"id": i, "name": f"web{i}"} for i in facts_by_host], "next": None}
+        return facts_by_host[int(path.split("/")[2])]
+
+    return handler
+
+
+async def test_diff_inventory_facts_does_not_depend_on_facts_history_budget(api, monkeypatch):
+    monkeypatch.setattr(ansible, "FACTS_HISTORY_MAX_TOTAL_BYTES", 1)
+    facts_by_host = {i: {"os": "rhel8", "blob": "x" * 100} for i in range(20)}
+    api(fleet_handler(facts_by_host))
+
+    first = await ansible.diff_inventory_facts(7, ["os"])
+    facts_by_host[3] = {"os": "rhel9", "blob": "x" * 100}
+    second = await ansible.diff_inventory_facts(7, ["os"])
+
+    assert first["new_baselines"] == 20
+    assert second["new_baselines"] == 0
+    assert second["changed_hosts"] == [
+        {"host_id": 3, "name": "web3", "changes": {"os": {"old": "rhel8", "new": "rhel9"}}}
+    ]
+
+
+async def test_diff_inventory_facts_reports_evicted_baseline(api, monkeypatch):
+    monkeypatch.setattr(ansible, "FLEET_FACTS_MAX_BASELINES", 1)
+    api(fleet_handler({1: {"os": "rhel8", "kernel": "5.14"}}))
+
+    await ansible.diff_inventory_facts(7, ["os"])
+    await ansible.diff_inventory_facts(7, ["kernel"])
+    result = await ansible.diff_inventory_facts(7, ["os"])
+
+    assert result["baseline"]["evicted"] is True
+    assert result["new_baselines"] == 1
@@ -0,0 +1,93 @@
+import ansible
+
+
+def inventory_handler(facts_by_host):
+    def handler(path, method, body):
+        if path.startswith("/inventories/7/hosts/"):
+            hosts = [{"id": i, "enabled": True, "has_active_failures": i == 1} for i in facts_by_host]
+            return {"results": hosts, "next": None}
+        if path.startswith("/inventories/7/groups/"):
+            return {"results": [{"id": 1, "name": "web"}], "next": None}
+        if path.startswith("/groups/1/all_hosts/"):
+            return {"results": [{"id": i} for i in facts_by_host], "next": None}
+        if path.startswith("/hosts/"):
+            return facts_by_host[int(path.split("/")[2])]
+        return {"id": 7, "name": "fleet", "modified": "2026-01-01T00:00:00Z"}
+
+    return handler
+
+
+async def test_statistics_count_hosts_groups_and_facts(api):
+    api(inventory_handler({1: {"ansible_distribution": "RedHat"}, 2: {"ansible_distribution": "RedHat"}, 3: {}}))
+
+    stats = await ansible.inventory_statistics(7, ["ansible_distribution"])
+
+    assert stats["hosts"] == 3
+    assert stats["failing"] == 1
+    assert stats["groups"] == {"web": {"hosts": 3, "failing": 1}}
+    assert stats["facts"]["ansible_distribution"]["values"] == [
+        {"value": "RedHat", "hosts": 2},
+        {"value": None, "hosts": 1},
+    ]
+    assert stats["cached"] is False
+
+
+async def test_statistics_are_cached_until_refresh(api):
+    calls = api(inventory_handler({1: {"ansible_distribution": "RedHat"}}))
+
+    await ansible.inventory_statistics(7, ["ansible_distribution"])
+    requests = len(calls)
+    cached = await ansible.inventory_statistics(7, ["ansible_distribution"])
+    refreshed = await ansible.inventory_statistics(7, ["ansible_distribution"], refresh=True)
+
+    assert cached["cached"] is True
+    assert len(calls) > requests + 1
+    assert refreshed["cached"] is False
+
+
+async def test_facts_errors_are_reported_and_not_cached(api):
+    facts_by_host = {1: {"ansible_distribution": "RedHat"}, 2: "Error 503: Service Unavailable"}
+    api(inventory_handler(facts_by_host))
+
+    stats = await ansible.inventory_statistics(7, ["ansible_distribution"])
+
+    assert stats["facts_errors"] == {"hosts": 1, "host_ids": [2]}
+    assert stats["facts"]["ansible_distribution"]["values"] == [{"value": "RedHat", "hosts": 1}]
+
+    facts_by_host[2] = {"ansible_distribution": "RedHat"}
+    recovered = await ansible.inventory_statistics(7, ["ansible_distribution"])
+
+    assert recovered["cached"] is False
+    assert recovered["facts_errors"]["hosts"] == 0
+    assert recovered["facts"]["ansible_distribution"]["values"] == [{"value": "RedHat", "hosts": 2}]
+
+
+async def test_histograms_keep_bools_and_numbers_apart(api):
+    api(inventory_handler({1: {"flag": True}, 2: {"flag": 1}, 3: {"flag": 1.0}, 4: {"flag": True}}))
+
+    stats = await ansible.inventory_statistics(7, ["flag"])
+
+    assert stats["facts"]["flag"]["distinct"] == 3
+    assert stats["facts"]["flag"]["values"][0] == {"value": True, "hosts": 2}
+
+
+async def test_statistics_without_fact_paths(api):
+    api(inventory_handler({1: {}, 2: {}}))
+
+    stats = await ansible.inventory_statistics(7)
+
+    assert stats["hosts"] == 2
+    assert stats["facts"] == {}
+
+
+async def test_expired_and_superseded_entries_are_pruned(api, monkeypatch):
+    api(inventory_handler({1: {"ansible_distribution": "RedHat"}}))
+    stale = {"modified": "2025-01-01T00:00:00Z", "cached_at": ansible.time.monotonic(), "result": {}}
+    expired = {"modified": "2026-01-01T00:00:00Z", "cached_at": ansible.time.monotonic() - 3600, "result": {}}
+    ansible.INVENTORY_STATS_CACHE[("default", 7, ("kernel",), 20)] = stale
+    ansible.INVENTORY_STATS_CACHE[("default", 8, (), 20)] = expired
+    monkeypatch.setattr(ansible, "INVENTORY_STATS_TTL", 60)
+
+    await ansible.inventory_statistics(7, ["ansible_distribution"])
+
+    assert list(ansible.INVENTORY_STATS_CACHE) == [("default", 7, ("ansible_distribution",), 20)]
@@ -0,0 +1,88 @@
+import ansible
+
+
+def failed_event(event, host, msg=None, results=None, task="Install packages"):
+    res = {"results": results} if results is not None else {"msg": msg}
+    return {
+        "event": event,
+        "play": "Patch",
+        "role": "",
+        "task": task,
+        "host_name": host,
+        "event_data": {"task_action": "ansible.builtin.dnf", "res": res},
+    }
+
+
+def job_handler(events, host_summaries):
+    def handler(path, method, body):
+        if "/job_events/" in path:
+            return {"results": events, "next": None}
+        if "/job_host_summaries/" in path:
+            return {"results": host_summaries, "next": None}
+        return {"id": 42, "name": "Patch", "status": "failed"}
+
+    return handler
+
+
+async def test_loop_task_counts_one_failure_per_host(api):
+    events = [
+        failed_event("runner_item_on_failed", "web1", msg="No package foo available"),
+        failed_event("runner_item_on_failed", "web1", msg="No package bar available"),
+        failed_event("runner_on_failed", "web1", msg="One or more items failed", results=[{}, {}]),
+    ]
+    api(job_handler(events, [{"host_name": "web1", "failures": 1, "dark": 0}]))
+
+    summary = await ansible.summarize_job_failures(42)
+
+    [task] = summary["failed_tasks"]
+    assert task["failures"] == 1
+    assert task["item_failures"] == 2
+    assert task["hosts"] == ["web1"]
+    assert [m["message"] for m in task["messages"]] == ["No package foo available", "No package bar available"]
+    assert summary["failed_hosts"][0]["failures"] == 1
+
+
+async def test_failures_are_grouped_by_task(api):
+    events = [
+        failed_event("runner_on_failed", "web1", msg="Service httpd failed", task="Start httpd"),
+        failed_event("runner_on_failed", "web2", msg="Service httpd failed", task="Start httpd"),
+        failed_event("runner_on_unreachable", "db1", msg="ssh: connect timed out", task="Gather facts"),
+    ]
+    api(job_handler(events, []))
+
+    summary = await ansible.summarize_job_failures(42)
+
+    tasks = {task["task"]: task for task in summary["failed_tasks"]}
+    assert summary["events_scanned"] == 3
+    assert tasks["Start httpd"]["failures"] == 2
+    assert tasks["Start httpd"]["messages"] == [{"message": "Service httpd failed", "count": 2}]
+    assert tasks["Gather facts"]["unreachable"] == 1
+    assert tasks["Gather facts"]["failures"] == 0
+
+
+async def test_messages_beyond_sample_limit_are_counted(api, monkeypatch):
+    monkeypatch.setattr(ansible, "FAILURE_SUMMARY_MAX_SAMPLES", 2)
+    events = [failed_event("runner_on_failed", f"web{i}", msg=f"error {i}") for i in range(5)]
+    api(job_handler(events, []))
+
+    summary = await ansible.summarize_job_failures(42)
+
+    [task] = summary["failed_tasks"]
+    assert task["failures"] == 5
+    assert len(task["hosts"]) == 2
+    assert len(task["messages"]) == 2
+    assert task["other_messages"] == 3
+
+
+async def test_async_task_failures_are_counted(api):
+    events = [
+        failed_event("runner_on_async_failed", "web1", msg="async task did not complete within the requested time"),
+    ]
+    api(job_handler(events, [{"host_name": "web1", "failures": 1, "dark": 0}]))
+
+    summary = await ansible.summarize_job_failures(42)
+
+    [task] = summary["failed_tasks"]
+    assert task["failures"] == 1
+    assert task["hosts"] == ["web1"]
+    assert task["messages"] == [{"message": "async task did not complete within the requested time", "count": 1}]